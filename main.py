@@ -6,4 +6,6 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 import interaccion
 
 if __name__ == "__main__":
+    interaccion.PROMPT_RICH = "--pretty" in sys.argv[1:]
+    interaccion.UI_ANIMATE = "--animate" in sys.argv[1:]
     interaccion.iniciar_aplicacion()
\ No newline at end of file
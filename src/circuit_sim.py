@@ -4,179 +4,661 @@ Motor de simulación MNA para circuitos DC.
 """
 from __future__ import annotations
 import re
+import io
+import csv
 import os
 import numpy as np
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+from stamp_numba import stamp, triplets
 
-# Intentamos importar scipy para velocidad en circuitos gigantes, si no, usamos numpy normal
-try:
-    from scipy import sparse
-    from scipy.sparse.linalg import spsolve
-    _HAS_SCIPY = True
-except Exception:
-    _HAS_SCIPY = False
+@lru_cache(maxsize=None)
+def _get_scipy():
+    """
+    (sparse, splu) de scipy, o None si no está instalado. Se importa recién al resolver:
+    cargar el módulo (parsear, exportar, dibujar) no paga el import de scipy.
+    """
+    try:
+        from scipy import sparse
+        from scipy.sparse.linalg import splu
+    except Exception:
+        return None
+    return sparse, splu
+
+# Actualizaciones de rango 1 que se encadenan antes de refactorizar desde cero
+MAX_RANK1_UPDATES = 20
 
 SI_PREFIXES = {
     'G': 1e9, 'M': 1e6, 'k': 1e3, 'K': 1e3, 'm': 1e-3,
     'u': 1e-6, 'µ': 1e-6, 'n': 1e-9, 'p': 1e-12,
 }
 
+@lru_cache(maxsize=1024)
 def parse_value(token: str) -> float:
-    """Convierte textos como '10k' a números (10000.0)."""
+    """Convierte textos como '10k' a números (10000.0). Memoizada: los netlists repiten valores."""
     token = token.strip()
     try:
         return float(token)
     except ValueError:
         pass
-    m = re.fullmatch(r"([+-]?[0-9]*\.?[0-9]+(?:[eE][+-]?[0-9]+)?)([a-zA-Zµ%]+)", token)
-    if not m:
-        raise ValueError(f"Valor inválido: '{token}'")
-    base = float(m.group(1))
-    suf = m.group(2)
-    if suf in SI_PREFIXES:
-        return base * SI_PREFIXES[suf]
-    for ch in suf:
-        if ch in SI_PREFIXES:
-            return base * SI_PREFIXES[ch]
-    raise ValueError(f"Sufijo desconocido: '{suf}'")
-
-@dataclass
-class Resistor:
-    name: str
-    n1: str
-    n2: str
-    value: float
-
-@dataclass
-class VSource:
-    name: str
-    n_plus: str
-    n_minus: str
-    value: float
-
-@dataclass
-class ISource:
-    name: str
-    n_plus: str
-    n_minus: str
-    value: float
+    # Separar número y sufijo recorriendo desde el final (sin regex)
+    i = len(token)
+    while i > 0 and (token[i-1].isalpha() or token[i-1] in 'µ%'):
+        i -= 1
+    try:
+        if i == 0: raise ValueError
+        base = float(token[:i])
+    except ValueError:
+        raise ValueError(f"Valor inválido: '{token}'") from None
+    # El prefijo, si lo hay, es la primera letra del sufijo ('mA' -> 'm', 'kOhm' -> 'k')
+    mult = SI_PREFIXES.get(token[i])
+    if mult is not None:
+        return base * mult
+    raise ValueError(f"Sufijo desconocido: '{token[i:]}'")
+
+def node_sort_key(n: str):
+    """Orden de presentación (solo al mostrar/exportar): nodos numéricos por valor, después el resto alfabético."""
+    return (0, int(n), '') if n.isdecimal() else (1, 0, n)
+
+def node_order(nodes) -> np.ndarray:
+    """
+    Índices que ordenan 'nodes' según node_sort_key, con np.argsort en vez de una clave
+    Python por nodo: primero los numéricos (por valor), después el resto alfabético.
+    """
+    nodes = np.asarray(nodes, dtype=str)
+    num = np.char.isdecimal(nodes)
+    i_num = np.flatnonzero(num); i_txt = np.flatnonzero(~num)
+    try:
+        valores = nodes[i_num].astype(np.int64)
+    except (OverflowError, ValueError):  # números enormes o dígitos no ASCII
+        return np.array(sorted(range(len(nodes)), key=lambda k: node_sort_key(nodes[k])), dtype=np.intp)
+    return np.concatenate((i_num[np.argsort(valores, kind='stable')],
+                           i_txt[np.argsort(nodes[i_txt], kind='stable')]))
+
+class _Columnas:
+    """
+    Componentes de un mismo tipo guardados por columnas (SoA): nombre, nodo a, nodo b, valor.
+    Los nodos son ids enteros; 'labels' es la tabla id -> etiqueta compartida con el Circuit.
+    """
+    __slots__ = ('names', 'na', 'nb', 'values', 'index', 'labels', '_arr')
+
+    def __init__(self, labels: List[str]):
+        self.names: List[str] = []
+        self.na: List[int] = []
+        self.nb: List[int] = []
+        self.labels = labels
+        self.values: List[float] = []
+        self.index: Dict[str,int] = {}  # nombre -> posición, para buscar sin recorrer
+        self._arr = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, name: str, a: int, b: int, value: float):
+        self.index[name] = len(self.names)
+        self.names.append(name); self.na.append(a); self.nb.append(b)
+        self.values.append(value)
+        self._arr = None
+
+    def extend(self, names: List[str], a, b, values):
+        """Agrega muchos componentes de una vez (a, b: ids de nodo)."""
+        self.index.update(zip(names, range(len(self.names), len(self.names) + len(names))))
+        self.names.extend(names); self.na.extend(a); self.nb.extend(b)
+        self.values.extend(values)
+        self._arr = None
+
+    def set_value(self, k: int, value: float):
+        self.values[k] = value
+        self._arr = None
+
+    def array(self):
+        """Los valores como ndarray contiguo; se congela una vez y se rehace solo si algo cambió."""
+        if self._arr is None: self._arr = np.array(self.values, dtype=float)
+        return self._arr
+
+class _Vista:
+    """Vista de un componente guardado en las columnas del Circuit; .value se puede editar."""
+    __slots__ = ('_cols', '_k')
+
+    def __init__(self, cols: _Columnas, k: int):
+        self._cols = cols; self._k = k
+
+    @property
+    def name(self) -> str: return self._cols.names[self._k]
+
+    @property
+    def value(self) -> float: return self._cols.values[self._k]
+
+    @value.setter
+    def value(self, v: float): self._cols.set_value(self._k, float(v))
+
+    def __repr__(self):
+        c = self._cols; k = self._k
+        return f"{type(self).__name__}({c.names[k]!r}, {c.labels[c.na[k]]!r}, {c.labels[c.nb[k]]!r}, {c.values[k]!r})"
+
+class Resistor(_Vista):
+    __slots__ = ()
+    n1 = property(lambda self: self._cols.labels[self._cols.na[self._k]])
+    n2 = property(lambda self: self._cols.labels[self._cols.nb[self._k]])
+
+class VSource(_Vista):
+    __slots__ = ()
+    n_plus = property(lambda self: self._cols.labels[self._cols.na[self._k]])
+    n_minus = property(lambda self: self._cols.labels[self._cols.nb[self._k]])
+
+class ISource(_Vista):
+    __slots__ = ()
+    n_plus = property(lambda self: self._cols.labels[self._cols.na[self._k]])
+    n_minus = property(lambda self: self._cols.labels[self._cols.nb[self._k]])
+
+class _Lista:
+    """Secuencia de solo lectura de vistas (circ.resistors, etc.); no copia las columnas."""
+    __slots__ = ('_cols', '_tipo')
+
+    def __init__(self, cols: _Columnas, tipo):
+        self._cols = cols; self._tipo = tipo
+
+    def __len__(self):
+        return len(self._cols)
+
+    def __getitem__(self, k: int):
+        return self._tipo(self._cols, range(len(self._cols))[k])
+
+    def __iter__(self):
+        return (self._tipo(self._cols, k) for k in range(len(self._cols)))
+
+class Solution(NamedTuple):
+    """
+    Resultado de solve(soa=True): arreglos paralelos, sin dicts. Se desempaqueta como
+    (nodes, V, res, vsrc); los dicts se arman solo si alguien los pide.
+    """
+    nodes: np.ndarray  # etiquetas, tierra primero
+    V: np.ndarray      # voltaje de cada nodo
+    res: np.recarray   # (name, I, n1, n2, R) por resistencia
+    vsrc: np.recarray  # (name, I) por fuente de tensión
+
+    def voltages_dict(self) -> Dict[str,float]:
+        return dict(zip(self.nodes.tolist(), self.V.tolist()))
+
+    def res_currents_dict(self) -> Dict[str,tuple]:
+        r = self.res
+        return {n: (i, a, b, R) for n, i, a, b, R in zip(r.name.tolist(), r.I.tolist(), r.n1.tolist(), r.n2.tolist(), r.R.tolist())}
+
+    def vsrc_currents_dict(self) -> Dict[str,float]:
+        return dict(zip(self.vsrc.name.tolist(), self.vsrc.I.tolist()))
+
+    def as_dicts(self):
+        """(voltages, res_currents, vsrc_currents), el formato por defecto de solve."""
+        return self.voltages_dict(), self.res_currents_dict(), self.vsrc_currents_dict()
 
 class Circuit:
     def __init__(self):
-        self.resistors: List[Resistor] = []
-        self.vsources: List[VSource] = []
-        self.isources: List[ISource] = []
-        self.nodes: set = set()
+        # Nodos internados al agregarlos: id entero en orden de aparición, tierra siempre es 0
+        self._node_id: Dict[str,int] = {'0': 0}
+        self._labels: List[str] = ['0']
+        # Almacenamiento columnar (SoA); resistors/vsources/isources son vistas sobre esto
+        self._R = _Columnas(self._labels)
+        self._V = _Columnas(self._labels)
+        self._I = _Columnas(self._labels)
+        # Estado del último solve_sparse, para re-resolver tras editar un valor
+        self._lu = None
+        self._lu_key = None  # valores de R con los que se factorizó (A solo depende de ellos)
+        self._b = None
+        self._idx = None
+        self._updates: list = []
+        self._stamp_idx = None
+        # Topología pre-procesada por compile() y orden COLAMD de la primera factorización
+        self._compiled = None
+        self._compiled_idx = None
+        self._perm_c = None
+        # Respaldo denso: (valores de R, factores LU) de scipy.linalg.lu_factor
+        self._lu_dense = None
 
-    def _add_node(self, node: str):
+    def __getstate__(self):
+        # La LU (SuperLU) y la clausura de compile() no se pueden picklear; se rehacen al resolver
+        state = self.__dict__.copy()
+        state.update(_lu=None, _lu_key=None, _updates=[], _compiled=None, _perm_c=None, _lu_dense=None)
+        return state
+
+    @property
+    def resistors(self) -> _Lista: return _Lista(self._R, Resistor)
+
+    @property
+    def vsources(self) -> _Lista: return _Lista(self._V, VSource)
+
+    @property
+    def isources(self) -> _Lista: return _Lista(self._I, ISource)
+
+    @property
+    def nodes(self) -> set:
+        return set(self._labels)
+
+    def _intern_node(self, node) -> int:
+        """Id entero de la etiqueta (lo crea si es nueva); '0' y 'GND' son tierra (id 0)."""
+        node = str(node)
         if node.upper() == 'GND': node = '0'
-        self.nodes.add(str(node))
+        nid = self._node_id.get(node)
+        if nid is None:
+            nid = self._node_id[node] = len(self._labels)
+            self._labels.append(node)
+        return nid
+
+    def _topologia_cambio(self):
+        # LU, índices de estampado y compile() guardados ya no sirven
+        self._lu = None; self._stamp_idx = None
+        self._compiled = None; self._perm_c = None
+        self._lu_dense = None
+
+    def _intern_bulk(self, a: List[str], b: List[str]):
+        """
+        Ids de dos columnas de etiquetas: np.unique deja una etiqueta de cada una y solo esas
+        pasan por _intern_node (en orden de primera aparición); el resto es indexar.
+        """
+        if not a: return [], []
+        uniq, first, inv = np.unique(np.array(a + b, dtype=str), return_index=True, return_inverse=True)
+        ids = np.empty(len(uniq), dtype=np.int64)
+        for k in np.argsort(first, kind='stable'): ids[k] = self._intern_node(uniq[k])
+        ids = ids[inv.ravel()].tolist()
+        return ids[:len(a)], ids[len(a):]
+
+    def _add_bulk(self, cols: _Columnas, names, a, b, values):
+        ia, ib = self._intern_bulk([str(x) for x in a], [str(x) for x in b])
+        cols.extend(list(names), ia, ib, np.asarray(values, dtype=float).tolist())
+        self._topologia_cambio()
+
+    def add_resistors_bulk(self, names: List[str], n1: List[str], n2: List[str], values):
+        """Como add_resistor para muchas resistencias, sin el costo por llamada."""
+        self._add_bulk(self._R, names, n1, n2, values)
+
+    def add_vsources_bulk(self, names: List[str], n_plus: List[str], n_minus: List[str], values):
+        self._add_bulk(self._V, names, n_plus, n_minus, values)
+
+    def add_isources_bulk(self, names: List[str], n_plus: List[str], n_minus: List[str], values):
+        self._add_bulk(self._I, names, n_plus, n_minus, values)
 
     def add_resistor(self, name: str, n1: str, n2: str, R: float):
-        self.resistors.append(Resistor(name, str(n1), str(n2), float(R)))
-        self._add_node(n1); self._add_node(n2)
+        self._R.append(name, self._intern_node(n1), self._intern_node(n2), float(R))
+        self._topologia_cambio()
 
     def add_vsource(self, name: str, n_plus: str, n_minus: str, V: float):
-        self.vsources.append(VSource(name, str(n_plus), str(n_minus), float(V)))
-        self._add_node(n_plus); self._add_node(n_minus)
+        self._V.append(name, self._intern_node(n_plus), self._intern_node(n_minus), float(V))
+        self._topologia_cambio()
 
     def add_isource(self, name: str, n_plus: str, n_minus: str, I: float):
-        self.isources.append(ISource(name, str(n_plus), str(n_minus), float(I)))
-        self._add_node(n_plus); self._add_node(n_minus)
+        self._I.append(name, self._intern_node(n_plus), self._intern_node(n_minus), float(I))
+        self._topologia_cambio()
+
+    def component(self, name: str):
+        """Busca un componente por nombre en O(1); KeyError si no existe."""
+        for cols, tipo in ((self._R, Resistor), (self._V, VSource), (self._I, ISource)):
+            if name in cols.index: return tipo(cols, cols.index[name])
+        raise KeyError(name)
 
     def node_index_map(self) -> Tuple[Dict[str,int], List[str]]:
-        if '0' not in self.nodes: self.nodes.add('0')
-        unknowns = sorted([n for n in self.nodes if n != '0'])
-        idx = {n:i for i,n in enumerate(unknowns)}
-        return idx, unknowns
+        # Incógnitas en orden de aparición (sin sort): el índice de un nodo es su id - 1
+        unknowns = self._labels[1:]
+        return dict(zip(unknowns, range(len(unknowns)))), unknowns
+
+    def stamp_indices(self):
+        """
+        Índices enteros de nodo (tierra = -1), cacheados hasta cambiar la topología:
+        (r_n1, r_n2, v_np, v_nn, i_np, i_nn) para R, V e I. Con el orden de node_index_map
+        el índice es directamente id - 1.
+        """
+        if self._stamp_idx is None:
+            def ids(nodos):
+                return np.array(nodos, dtype=np.int32) - 1
+            self._stamp_idx = (
+                ids(self._R.na), ids(self._R.nb),
+                ids(self._V.na), ids(self._V.nb),
+                ids(self._I.na), ids(self._I.nb),
+            )
+        return self._stamp_idx
 
     def assemble_mna(self):
         idx_map, nodes = self.node_index_map()
         N = len(nodes)
-        M = len(self.vsources)
-        G = np.zeros((N,N), dtype=float)
-        Ivec = np.zeros((N,), dtype=float)
-        B = np.zeros((N,M), dtype=float)
-        E = np.zeros((M,), dtype=float)
-
-        for r in self.resistors:
-            g = 1.0 / r.value
-            n1 = r.n1; n2 = r.n2
-            if n1 != '0': i = idx_map[n1]; G[i,i] += g
-            if n2 != '0': j = idx_map[n2]; G[j,j] += g
-            if n1 != '0' and n2 != '0':
-                i = idx_map[n1]; j = idx_map[n2]
-                G[i,j] -= g; G[j,i] -= g
-
-        for src in self.isources:
-            n_plus = src.n_plus; n_minus = src.n_minus; val = src.value
-            if n_plus != '0': Ivec[idx_map[n_plus]] -= val
-            if n_minus != '0': Ivec[idx_map[n_minus]] += val
-
-        for k, vs in enumerate(self.vsources):
-            E[k] = vs.value
-            if vs.n_plus != '0': B[idx_map[vs.n_plus], k] = 1.0
-            if vs.n_minus != '0': B[idx_map[vs.n_minus], k] = -1.0
-
-        if M > 0:
-            top = np.hstack((G, B))
-            bottom = np.hstack((B.T, np.zeros((M, M), dtype=float)))
-            A = np.vstack((top, bottom))
-            z = np.concatenate((Ivec, E))
-        else:
-            A = G; z = Ivec
+        M = len(self._V)
+        # A y z se reservan una vez con su tamaño final; G, B e Ivec son vistas de sus bloques
+        A = np.zeros((N+M, N+M), dtype=float)
+        z = np.zeros((N+M,), dtype=float)
+        G = A[:N, :N]; B = A[:N, N:]; Ivec = z[:N]
+
+        r_n1, r_n2, v_np, v_nn, i_np, i_nn = self.stamp_indices()
+        values = self.values_vector()
+        R = len(self._R)
+        stamp(r_n1, r_n2, values[:R], v_np, v_nn, G, B)
+        A[N:, :N] = B.T
+
+        self._estampar_fuentes(z, N, values)
 
         return A, z, idx_map, nodes
 
-    def solve(self, use_sparse_if_possible: bool = True):
-        A, z, idx_map, nodes = self.assemble_mna()
-        
-        try:
-            if _HAS_SCIPY and use_sparse_if_possible and A.shape[0] > 50:
-                A_sp = sparse.csr_matrix(A)
-                sol = spsolve(A_sp, z)
-            else:
+    def _estampar_fuentes(self, z, N, values):
+        """Escribe en z (ya en cero) las fuentes: V en z[N:] e I en los nodos. No toca A."""
+        _, _, _, _, i_np, i_nn = self.stamp_indices()
+        R = len(self._R); M = len(self._V)
+        z[N:] = values[R:R+M]
+        I = values[R+M:]
+        np.add.at(z, i_np[i_np >= 0], -I[i_np >= 0])
+        np.add.at(z, i_nn[i_nn >= 0], I[i_nn >= 0])
+
+    def rhs_vector(self):
+        """Solo el z del sistema MNA, O(n): para re-resolver con una LU ya factorizada."""
+        N = len(self._labels) - 1
+        z = np.zeros(N + len(self._V))
+        self._estampar_fuentes(z, N, self.values_vector())
+        return z
+
+    def values_vector(self):
+        """Valores de todos los componentes en el orden que espera compile(): R, V, I."""
+        return np.concatenate((self._R.array(), self._V.array(), self._I.array()))
+
+    def compile(self):
+        """
+        Pre-procesa la topología una sola vez (como el análisis estructural de SPICE).
+        Devuelve f(values) -> (A_csc, z) que solo recalcula la parte numérica.
+        """
+        idx_map, nodes = self.node_index_map()
+        N = len(nodes); M = len(self._V); R = len(self._R); n = N + M
+        r_n1, r_n2, v_np, v_nn, i_np, i_nn = self.stamp_indices()
+
+        # Resistencias: hasta 4 entradas (fila, col, signo) que toman g[slot]
+        rows, cols, slot, sign = triplets(r_n1, r_n2)
+
+        # Fuentes de tensión: los ±1 de B y B^T no dependen de los valores
+        kv = np.arange(M)
+        p = v_np >= 0; q = v_nn >= 0
+        rows = np.concatenate((rows, v_np[p], N + kv[p], v_nn[q], N + kv[q])).astype(np.int64)
+        cols = np.concatenate((cols, N + kv[p], v_np[p], N + kv[q], v_nn[q])).astype(np.int64)
+        fijos = np.concatenate((np.ones(2 * p.sum()), -np.ones(2 * q.sum())))
+
+        # Patrón CSC fijo y posición de cada entrada dentro de A.data (duplicados se suman)
+        sparse = _get_scipy()[0]
+        patron = sparse.csc_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+        patron.sort_indices()
+        claves = np.repeat(np.arange(n, dtype=np.int64), np.diff(patron.indptr)) * n + patron.indices
+        pos = np.searchsorted(claves, cols * n + rows)
+        indices, indptr, nnz = patron.indices, patron.indptr, len(claves)
+        ip = i_np >= 0; iq = i_nn >= 0
+
+        # Buffers reservados una vez y reutilizados en cada llamada (sin alocar por re-solve)
+        g = np.empty(R); z = np.empty(n)
+        w = np.empty(len(pos)); nR = len(slot)
+        w[nR:] = fijos
+
+        def f(values):
+            """El z devuelto es un buffer compartido: vale hasta la próxima llamada."""
+            np.divide(1.0, values[:R], out=g)
+            np.take(g, slot, out=w[:nR])
+            w[:nR] *= sign
+            data = np.bincount(pos, weights=w, minlength=nnz)
+            z.fill(0.0)
+            z[N:] = values[R:R+M]
+            I = values[R+M:]
+            np.add.at(z, i_np[ip], -I[ip])
+            np.add.at(z, i_nn[iq], I[iq])
+            return sparse.csc_matrix((data, indices, indptr), shape=(n, n)), z
+
+        self._compiled = f; self._compiled_idx = (idx_map, nodes)
+        return f
+
+    def assemble_mna_sparse(self):
+        """Arma el mismo sistema que assemble_mna pero disperso (CSC), vía compile()."""
+        f = self._compiled or self.compile()
+        A, z = f(self.values_vector())
+        idx_map, nodes = self._compiled_idx
+        return A, z, idx_map, nodes
+
+    def solve(self, use_sparse_if_possible: bool = True, soa: bool = False):
+        """Con scipy siempre por LU disperso (solve_sparse); el denso queda como respaldo."""
+        if use_sparse_if_possible and _get_scipy() is not None:
+            return solve_sparse(self, soa)
+
+        if _get_scipy() is None:
+            A, z, idx_map, nodes = self.assemble_mna()
+            try:
                 sol = np.linalg.solve(A, z)
-        except np.linalg.LinAlgError as e:
-            raise RuntimeError(f"Error numérico (Matriz Singular): {e}")
+            except np.linalg.LinAlgError as e:
+                raise RuntimeError(f"Error numérico (Matriz Singular): {e}")
+            return self._resultados(sol, idx_map, nodes, soa)
 
-        M = len(self.vsources); N = len(nodes)
-        Vsol = sol[:N]
-        Isrc = sol[N: N+M] if M > 0 else []
+        # Con scipy la LU densa se guarda: mientras las R no cambien solo se arma el z nuevo (sin A)
+        import warnings
+        from scipy.linalg import lu_factor, lu_solve
+        clave = self._R.array().tobytes()
+        if self._lu_dense is None or self._lu_dense[0] != clave:
+            A, z, idx_map, nodes = self.assemble_mna()
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')  # el pivote nulo se reporta abajo como error
+                lu, piv = lu_factor(A, overwrite_a=True, check_finite=False)
+            if np.any(np.diag(lu) == 0.0):
+                raise RuntimeError("Error numérico (Matriz Singular): pivote nulo en la factorización LU")
+            self._lu_dense = (clave, (lu, piv))
+        else:
+            z = self.rhs_vector()
+            idx_map, nodes = self.node_index_map()
+        sol = lu_solve(self._lu_dense[1], z, check_finite=False)
+        return self._resultados(sol, idx_map, nodes, soa)
 
-        voltages = {'0': 0.0}
-        for n, i in idx_map.items(): voltages[n] = float(Vsol[i])
+    def resolve_with_update(self, component, new_value: float, soa: bool = False):
+        """
+        Cambia el valor de un componente y re-resuelve reutilizando la LU de solve_sparse.
+        Fuentes: solo cambia b. Resistencias: actualización de rango 1 (Sherman-Morrison).
+        """
+        new_value = float(new_value)
+        # Si las R se editaron directo (vista.value = ...) la LU ya no corresponde a A
+        if (self._lu is None or len(self._updates) >= MAX_RANK1_UPDATES
+                or self._R.array().tobytes() != self._lu_key):
+            component.value = new_value
+            return solve_sparse(self, soa)
 
-        res_currents = {}
-        for r in self.resistors:
-            v1 = voltages.get(r.n1, 0.0)
-            v2 = voltages.get(r.n2, 0.0)
-            I_R = (v1 - v2) / r.value
-            res_currents[r.name] = (float(I_R), r.n1, r.n2, float(r.value))
+        idx_map, nodes = self._idx
+        if isinstance(component, Resistor):
+            # A' = A + dg * u u^T con u = e_n1 - e_n2
+            u = np.zeros(len(self._b))
+            if component.n1 != '0': u[idx_map[component.n1]] = 1.0
+            if component.n2 != '0': u[idx_map[component.n2]] = -1.0
+            dg = 1.0 / new_value - 1.0 / component.value
+            w = self._aplicar_lu(u)
+            if abs(1.0 + dg * (u @ w)) < 1e-12:
+                component.value = new_value
+                return solve_sparse(self, soa)
+            self._updates.append((u, dg, w))
+        component.value = new_value
+        if isinstance(component, Resistor):
+            self._lu_key = self._R.array().tobytes()  # A ya incluye el cambio vía _updates
 
-        vsrc_currents = {}
-        for k, vs in enumerate(self.vsources):
-            vsrc_currents[vs.name] = float(Isrc[k]) if M > 0 else 0.0
+        # b se rehace de los valores actuales: cubre también fuentes editadas directo
+        self._b = self.rhs_vector()
+        return self._resultados(self._aplicar_lu(self._b), idx_map, nodes, soa)
 
-        return voltages, res_currents, vsrc_currents
+    def _aplicar_lu(self, b):
+        """x = A^-1 b con la LU base y las actualizaciones de rango 1 acumuladas."""
+        x = self._lu.solve(b)
+        for u, dg, w in self._updates:
+            x = x - w * (dg * (u @ x) / (1.0 + dg * (u @ w)))
+        return x
+
+    def _resultados(self, sol, idx_map, nodes, soa: bool = False):
+        """
+        Convierte el vector solución en (voltages, res_currents, vsrc_currents).
+        Con soa=True devuelve la Solution (arreglos paralelos) sin armar dicts.
+        """
+        M = len(self._V); N = len(nodes); R = len(self._R)
+        # Tierra en la posición 0: el índice de nodo + 1 indexa V (tierra = -1 -> 0)
+        V = np.concatenate(([0.0], sol[:N]))
+        Isrc = sol[N: N+M]
+        r_n1, r_n2 = self.stamp_indices()[:2]
+        R_val = self._R.array()
+        I_R = (V[r_n1 + 1] - V[r_n2 + 1]) / R_val
+        solucion = self._resultados_soa(nodes, V, I_R, R_val, Isrc)
+        return solucion if soa else solucion.as_dicts()
+
+    def _resultados_soa(self, nodes, V, I_R, R_val, Isrc):
+        """
+        nodes: etiquetas (tierra primero, después en orden de aparición), V: voltajes.
+        res: recarray (name, I, n1, n2, R); vsrc: recarray (name, I).
+        """
+        res = np.rec.fromarrays([
+            np.array(self._R.names, dtype=str), I_R,
+            np.array([self._labels[a] for a in self._R.na], dtype=str),
+            np.array([self._labels[b] for b in self._R.nb], dtype=str), R_val,
+        ], names='name,I,n1,n2,R')
+        vsrc = np.rec.fromarrays([
+            np.array(self._V.names, dtype=str),
+            np.asarray(Isrc, dtype=float),
+        ], names='name,I')
+        return Solution(np.array(['0'] + nodes), V, res, vsrc)
+
+class _LUPermutada:
+    """LU de A[:, perm] (orden de columnas reutilizado); solve() devuelve x en el orden original."""
+    def __init__(self, lu, perm):
+        self.lu = lu; self.perm = perm
+
+    def solve(self, b):
+        x = np.empty_like(b)
+        x[self.perm] = self.lu.solve(b)
+        return x
+
+def solve_sparse(circ: Circuit, soa: bool = False):
+    """
+    Resuelve con LU disperso (splu sobre CSC). El orden COLAMD se calcula en la primera
+    factorización y se reutiliza mientras no cambie la topología. Sin scipy usa el denso.
+    """
+    scipy = _get_scipy()
+    if scipy is None:
+        return circ.solve(use_sparse_if_possible=False, soa=soa)
+    splu = scipy[1]
+    f = circ._compiled or circ.compile()
+    values = circ.values_vector()
+    A, z = f(values)
+    idx_map, nodes = circ._compiled_idx
+
+    # A solo depende de las resistencias: si no cambiaron, alcanza con la LU guardada y el z nuevo
+    clave = values[:len(circ._R)].tobytes()
+    if circ._lu is not None and clave == circ._lu_key:
+        circ._b = z.copy()  # z es el buffer compartido de compile()
+        return circ._resultados(circ._aplicar_lu(z), idx_map, nodes, soa)
+
+    try:
+        if circ._perm_c is None:
+            lu = splu(A, permc_spec="COLAMD")
+            circ._perm_c = np.argsort(lu.perm_c)  # perm_c[j] = posición de la columna j
+        else:
+            lu = _LUPermutada(splu(A[:, circ._perm_c], permc_spec="NATURAL"), circ._perm_c)
+    except RuntimeError as e:
+        raise RuntimeError(f"Error numérico (Matriz Singular): {e}")
+    circ._lu, circ._lu_key, circ._b, circ._idx, circ._updates = lu, clave, z.copy(), (idx_map, nodes), []
+    return circ._resultados(lu.solve(z), idx_map, nodes, soa)
+
+# Una línea de componente: nombre (R/V/I...), nodo a, nodo b, valor. Lo que siga se ignora
+_LINE_RE = re.compile(r'\s*(([RVI])\S*)\s+(\S+)\s+(\S+)\s+(\S+)', re.IGNORECASE)
 
 def parse_netlist_lines(lines: List[str]) -> Circuit:
-    circ = Circuit()
-    for raw in lines:
-        line = raw.strip()
-        if not line or line.startswith(('*','#',';')): continue
-        parts = re.split(r"\s+", line)
-        tok = parts[0].upper()
+    # Columnas por tipo (nombres, nodo a, nodo b, valores); el Circuit se llena al final en bloque
+    cols = {t: ([], [], [], []) for t in 'RVI'}
+    match = _LINE_RE.match
+    for line in lines:
+        # Un solo match en C por línea; comentarios y líneas vacías o incompletas no coinciden
+        m = match(line)
+        if m is None: continue
+        name, tipo, a, b, val = m.groups()
         try:
-            if tok.startswith('R'):
-                circ.add_resistor(parts[0], parts[1], parts[2], parse_value(parts[3]))
-            elif tok.startswith('V'):
-                circ.add_vsource(parts[0], parts[1], parts[2], parse_value(parts[3]))
-            elif tok.startswith('I'):
-                circ.add_isource(parts[0], parts[1], parts[2], parse_value(parts[3]))
-        except Exception: pass
+            v = parse_value(val)
+        except ValueError: continue
+        c = cols[tipo.upper()]
+        c[0].append(name); c[1].append(a); c[2].append(b); c[3].append(v)
+
+    circ = Circuit()
+    circ.add_resistors_bulk(*cols['R'])
+    circ.add_vsources_bulk(*cols['V'])
+    circ.add_isources_bulk(*cols['I'])
     return circ
 
 def load_netlist(path: str) -> Circuit:
-    with open(path, 'r', encoding='utf-8') as f: return parse_netlist_lines(f.readlines())
\ No newline at end of file
+    # Una sola lectura en bloque (rinde en discos de red) y el corte de líneas en memoria
+    with open(path, 'rb') as f: data = f.read()
+    return parse_netlist_lines(data.decode('utf-8').splitlines())
+
+def export_results_csv(path: str, nodes, V, res, vsrc):
+    """
+    Guarda los resultados (formato soa de solve) en CSV UTF-8: bloque de nodos, de resistencias y de fuentes.
+    Los números se formatean por columna (np.char.mod); csv.writer arma el texto en memoria
+    (cita etiquetas con ',' o '"') y el archivo se escribe de una sola vez.
+    """
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator='\n')
+
+    def bloque(encabezado, *columnas):
+        cols = [c.tolist() if c.dtype.kind in 'US' else np.char.mod('%.12g', c).tolist()
+                for c in map(np.asarray, columnas)]
+        w.writerow(encabezado); w.writerows(zip(*cols))
+
+    I = np.asarray(res.I, dtype=float); R = np.asarray(res.R, dtype=float)
+    orden = node_order(nodes)
+    bloque(("node", "voltage"), nodes[orden], V[orden]); buf.write('\n')
+    bloque(("resistor", "n1", "n2", "current", "resistance", "power"), res.name, res.n1, res.n2, I, R, I * I * R)
+    buf.write('\n')
+    bloque(("vsource", "current"), vsrc.name, vsrc.I)
+    with open(path, 'w', newline='', encoding='utf-8') as f: f.write(buf.getvalue())
+
+def _layout(circ: Circuit):
+    """
+    Posiciones de los nodos (id -> (x, y)) en [-1, 1]. Circuitos chicos: en un círculo.
+    Con más de 20 nodos y scipy: embebido espectral (vectores 2 y 3 del laplaciano del grafo).
+    """
+    n = len(circ._labels)
+    scipy = _get_scipy()
+    if n > 20 and scipy is not None:
+        from scipy.sparse.linalg import eigsh, ArpackError, ArpackNoConvergence
+        a = np.concatenate((circ._R.na, circ._V.na)); b = np.concatenate((circ._R.nb, circ._V.nb))
+        adj = scipy[0].coo_matrix((np.ones(len(a)), (a, b)), shape=(n, n))
+        adj = ((adj + adj.T) > 0).astype(float)
+        L = scipy[0].diags(np.asarray(adj.sum(axis=1)).ravel()) - adj
+        try:
+            # shift-invert cerca de 0: los 3 autovalores más chicos sin iterar sobre L singular
+            w, vec = eigsh(L.tocsc(), k=3, sigma=-1e-2)
+            xy = vec[:, np.argsort(w)[1:3]]
+            span = np.abs(xy).max(axis=0)
+            return xy / np.where(span > 0, span, 1.0)
+        except (ArpackNoConvergence, ArpackError):
+            pass  # sin convergencia: queda el círculo
+    t = 2 * np.pi * np.arange(n) / max(n, 1)
+    return np.column_stack((np.cos(t), np.sin(t)))
+
+def draw_circuit(circ: Circuit, path: str, size: int = 600):
+    """
+    Dibuja el grafo del circuito como SVG (texto plano, sin matplotlib):
+    nodos como círculos y cada componente como una línea rotulada entre sus nodos.
+    """
+    from html import escape
+    pos = (_layout(circ) * 0.42 + 0.5) * size
+    colores = (('#1f77b4', circ._R), ('#d62728', circ._V), ('#2ca02c', circ._I))
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+           f'font-family="sans-serif" font-size="12">']
+    for color, c in colores:
+        for name, a, b in zip(c.names, c.na, c.nb):
+            (x1, y1), (x2, y2) = pos[a], pos[b]
+            out.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" stroke="{color}"/>'
+                       f'<text x="{(x1+x2)/2:.1f}" y="{(y1+y2)/2:.1f}" fill="{color}">{escape(name)}</text>')
+    for (x, y), label in zip(pos, circ._labels):
+        out.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="12" fill="white" stroke="black"/>'
+                   f'<text x="{x:.1f}" y="{y + 4:.1f}" text-anchor="middle">{escape(label)}</text>')
+    out.append('</svg>')
+    with open(path, 'w', encoding='utf-8') as f: f.write('\n'.join(out))
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Simulador DC por MNA")
+    ap.add_argument("netlist")
+    ap.add_argument("--out-csv", help="archivo CSV de resultados")
+    ap.add_argument("--out-plot", help="diagrama del circuito (SVG)")
+    args = ap.parse_args()
+
+    circ = load_netlist(args.netlist)
+    nodes, V, res, vsrc = circ.solve(soa=True)
+    if args.out_plot: draw_circuit(circ, args.out_plot)
+    if args.out_csv: export_results_csv(args.out_csv, nodes, V, res, vsrc)
+    else:
+        for n, v in zip(nodes, V.tolist()): print(f"V({n}) = {v:.6g} V")
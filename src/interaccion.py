@@ -1,19 +1,45 @@
 import sys
 import time
-from rich.prompt import Prompt
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from rich.text import Text
 import ui
-from circuit_sim import Circuit, parse_value, load_netlist
+from circuit_sim import Circuit, parse_value
+from netlist_cache import cached_load_netlist
 
 class ReiniciarSistema(Exception): pass
 class VolverAtras(Exception): pass
 
+# Prompts con Rich (Prompt.ask); por defecto se lee directo de stdin. main.py lo activa con --pretty
+PROMPT_RICH = False
+# Pausas de "animación" entre pantallas; apagadas salvo con --animate (no frenan el uso por stdin)
+UI_ANIMATE = False
+
+@lru_cache(maxsize=None)
+def _texto_plano(mensaje):
+    """El mensaje sin markup de Rich, para el prompt rápido."""
+    return Text.from_markup(mensaje).plain
+
+def _leer(mensaje, default=None):
+    """Lee una respuesta: write + readline, sin el pipeline de render/validación de Rich."""
+    ui.console.flush()  # la pantalla armada sale entera antes del prompt
+    if PROMPT_RICH:
+        from rich.prompt import Prompt  # solo con --pretty
+        return Prompt.ask(mensaje, default=default, show_default=False)
+    sys.stdout.write(_texto_plano(mensaje) + ": ")
+    sys.stdout.flush()
+    linea = sys.stdin.readline()
+    if not linea: raise EOFError()
+    linea = linea.strip()
+    return linea if linea else default
+
 def input_inteligente(mensaje, tipo="float", default=None):
     """
     Pide un dato al usuario. 
     Gestiona Q/R/B, evita duplicados (show_default=False) y errores de None.
     """
     while True:
-        valor_raw = Prompt.ask(mensaje, default=default, show_default=False)
+        valor_raw = _leer(mensaje, default)
         
         if valor_raw is None:
             val = ""
@@ -36,6 +62,11 @@ def input_inteligente(mensaje, tipo="float", default=None):
             except ValueError:
                 ui.console.print(f"[red]❌ Valor no válido.[/red] Intente: 10, 1k, 5m")
 
+def pausa(mensaje="[dim]Enter para continuar[/dim]"):
+    """Espera un Enter solo si hay terminal; en ejecuciones por lotes (stdin redirigido) sigue de largo."""
+    if sys.stdin.isatty():
+        input_inteligente(mensaje, tipo="str", default="")
+
 def modo_crear_circuito():
     """Construye el circuito mostrando el diagrama en vivo."""
     circ = Circuit()
@@ -47,9 +78,7 @@ def modo_crear_circuito():
         ui.mostrar_resumen_vivo(circ)
         ui.mostrar_ayuda_navegacion()
 
-        ui.console.print("\n[1] Agregar Resistencia (R)")
-        ui.console.print("[2] Agregar Fuente de Voltaje (V)")
-        ui.console.print("[3] [bold green]CALCULAR Y SIMULAR ▶[/bold green]")
+        ui.console.write(ui.MENU_CREAR)
         
         try:
             opcion = input_inteligente("\nSeleccione opción", tipo="str")
@@ -57,7 +86,7 @@ def modo_crear_circuito():
             if opcion == "3":
                 if not circ.resistors and not circ.vsources:
                     ui.console.print("[red]¡Circuito vacío![/red]")
-                    time.sleep(1)
+                    if UI_ANIMATE: time.sleep(1)
                     continue
                 return circ
 
@@ -90,21 +119,25 @@ def ejecutar_simulacion(circ):
 
     ui.mostrar_encabezado()
     try:
-        voltages, res_currents, vsrc_currents = circ.solve()
-        ui.mostrar_resultados(voltages, res_currents, vsrc_currents)
+        # El solve corre en otro hilo para que el spinner se vea mientras se factoriza
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            fut = pool.submit(circ.solve, soa=True)
+            ui.console.flush()
+            with ui.console.status("[cyan]Resolviendo MNA..."):
+                nodes, V, res, vsrc = fut.result()
+        ui.mostrar_resultados(nodes, V, res, vsrc)
         
         input_inteligente("\n[Presione Enter para Reiniciar]", tipo="str", default="")
         
     except Exception as e:
-        ui.console.print(ui.Panel(f"[bold red]Error Matemático:[/bold red] {e}\n\nCausa probable: Circuito abierto o sin Tierra (0).", title="ERROR", border_style="red"))
+        ui.mostrar_error_matematico(e)
         # Pregunta simple para reintentar o salir
         resp = input_inteligente("¿Intentar corregir? (s/n)", tipo="str", default="s")
         if resp.lower() != 's': sys.exit(0)
 
 def ciclo_principal():
     ui.mostrar_encabezado()
-    ui.console.print("\n[1] Cargar Ejercicio 10 (TP4)")
-    ui.console.print("[2] Crear circuito nuevo paso a paso")
+    ui.console.write(ui.MENU_PRINCIPAL)
     
     try:
         opcion = input_inteligente("Seleccione", tipo="str")
@@ -113,16 +146,17 @@ def ciclo_principal():
         # OPCION 1: Archivo
         if opcion == "1":
             ruta = "examples/ejercicio_10_tp4.net"
-            if not os.path.exists(ruta):
+            # Sin os.path.exists previo: el stat de la caché ya detecta si falta el archivo
+            try:
+                circ = cached_load_netlist(ruta)
+            except FileNotFoundError:
                 ui.console.print(f"[bold red]Error:[/bold red] Falta '{ruta}'.")
-                time.sleep(3); return 
-            
-            circ = load_netlist(ruta)
+                pausa(); return 
             ui.console.print(f"[green]✓ Circuito cargado[/green]")
             
             # Mostrar diagrama antes de calcular
             ui.mostrar_resumen_vivo(circ)
-            time.sleep(2.0)
+            pausa("\n[dim]Enter para calcular[/dim]")
         
         # OPCION 2: Manual
         elif opcion == "2":
@@ -147,5 +181,6 @@ def iniciar_aplicacion():
             break
         except Exception as e:
             ui.console.print(f"[bold red]Error Inesperado:[/bold red] {e}")
+            ui.console.flush()
             input("Enter para salir...")
             break
\ No newline at end of file
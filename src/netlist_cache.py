@@ -0,0 +1,42 @@
+"""
+netlist_cache.py
+Caché en disco de netlists ya parseados (pickle), indexado por ruta + mtime.
+"""
+from __future__ import annotations
+import os
+import pickle
+import hashlib
+from functools import lru_cache
+
+from circuit_sim import Circuit, load_netlist
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "simulador")
+# Subir si cambia cómo Circuit guarda sus datos: invalida los pickles viejos
+CACHE_FORMAT = 4
+
+@lru_cache(maxsize=None)
+def _ruta_absoluta(path: str) -> str:
+    """abspath de cada ruta se resuelve una sola vez por sesión."""
+    return os.path.abspath(path)
+
+def _cache_path(path: str) -> str:
+    """Archivo de caché para 'path'; cambia solo si el .net se modifica. Sin el archivo: FileNotFoundError."""
+    firma = f"{CACHE_FORMAT}:{_ruta_absoluta(path)}:{os.stat(path).st_mtime_ns}"
+    key = hashlib.blake2b(firma.encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.pkl")
+
+def cached_load_netlist(path: str) -> Circuit:
+    """Como load_netlist, pero reutiliza el Circuit guardado si el archivo no cambió."""
+    cache = _cache_path(path)
+    try:
+        with open(cache, 'rb') as f: return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    circ = load_netlist(path)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache, 'wb') as f: pickle.dump(circ, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # Sin caché (ej: HOME de solo lectura), no es un error
+    return circ
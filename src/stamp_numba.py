@@ -0,0 +1,99 @@
+"""
+stamp_numba.py
+Kernels numéricos (estampado MNA, tripletas, potencias) compilados con Numba (si está instalado).
+"""
+import numpy as np
+
+# Numba es opcional: si no está, se usa la versión vectorizada con NumPy
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+    prange = range
+
+def _stamp_py(r_n1, r_n2, r_val, v_np, v_nn, G, B):
+    """
+    Suma las conductancias en G (N x N) y la incidencia de las fuentes en B (N x M).
+    Los nodos vienen como índices enteros; -1 es tierra.
+    """
+    for k in range(r_n1.shape[0]):
+        g = 1.0 / r_val[k]
+        i = r_n1[k]; j = r_n2[k]
+        if i >= 0: G[i, i] += g
+        if j >= 0: G[j, j] += g
+        if i >= 0 and j >= 0:
+            G[i, j] -= g; G[j, i] -= g
+
+    for k in range(v_np.shape[0]):
+        if v_np[k] >= 0: B[v_np[k], k] = 1.0
+        if v_nn[k] >= 0: B[v_nn[k], k] = -1.0
+
+def _triplets_numpy(r_n1, r_n2):
+    """
+    Entradas COO de G: (fila, col, slot, signo), hasta 4 por resistencia.
+    El valor de cada entrada es signo * g[slot]; los índices repetidos se suman.
+    """
+    k = np.arange(r_n1.shape[0])
+    a = r_n1 >= 0; b = r_n2 >= 0; ab = a & b
+    rows = np.concatenate((r_n1[a], r_n2[b], r_n1[ab], r_n2[ab]))
+    cols = np.concatenate((r_n1[a], r_n2[b], r_n2[ab], r_n1[ab]))
+    slot = np.concatenate((k[a], k[b], k[ab], k[ab]))
+    sign = np.concatenate((np.ones(a.sum() + b.sum()), -np.ones(2 * ab.sum())))
+    return rows, cols, slot, sign
+
+def _triplets_py(r_n1, r_n2):
+    """
+    Mismas tripletas, 4 lugares fijos por resistencia ([4k, 4k+4)): cada iteración es
+    independiente, así que con Numba se reparte entre hilos (prange). Tierra queda con fila -1.
+    """
+    R = r_n1.shape[0]
+    rows = np.empty(4 * R, dtype=np.int64); cols = np.empty(4 * R, dtype=np.int64)
+    slot = np.empty(4 * R, dtype=np.int64); sign = np.empty(4 * R, dtype=np.float64)
+    for k in prange(R):
+        i = r_n1[k]; j = r_n2[k]; p = 4 * k
+        rows[p] = i; cols[p] = i; sign[p] = 1.0
+        rows[p+1] = j; cols[p+1] = j; sign[p+1] = 1.0
+        ambos = i >= 0 and j >= 0
+        rows[p+2] = i if ambos else -1; cols[p+2] = j; sign[p+2] = -1.0
+        rows[p+3] = j if ambos else -1; cols[p+3] = i; sign[p+3] = -1.0
+        slot[p] = k; slot[p+1] = k; slot[p+2] = k; slot[p+3] = k
+    return rows, cols, slot, sign
+
+if _HAS_NUMBA:
+    _triplets_nb = njit(cache=True, parallel=True)(_triplets_py)
+
+    def triplets(r_n1, r_n2):
+        """Tripletas con el kernel compilado; se descartan las entradas de tierra."""
+        rows, cols, slot, sign = _triplets_nb(r_n1, r_n2)
+        ok = rows >= 0
+        return rows[ok], cols[ok], slot[ok], sign[ok]
+else:
+    triplets = _triplets_numpy
+
+def _stamp_numpy(r_n1, r_n2, r_val, v_np, v_nn, G, B):
+    """Mismo estampado sin bucle Python: tripletas COO acumuladas con np.add.at (en C)."""
+    rows, cols, slot, sign = _triplets_numpy(r_n1, r_n2)
+    np.add.at(G, (rows, cols), sign * (1.0 / r_val)[slot])
+
+    k = np.arange(v_np.shape[0])
+    B[v_np[v_np >= 0], k[v_np >= 0]] = 1.0
+    B[v_nn[v_nn >= 0], k[v_nn >= 0]] = -1.0
+
+# cache=True guarda el binario compilado junto al módulo: solo la primera ejecución paga el JIT
+stamp = njit(cache=True)(_stamp_py) if _HAS_NUMBA else _stamp_numpy
+
+def _powers_py(I, R):
+    """Potencia I²·R de cada resistencia y el total, en una sola pasada."""
+    P = np.empty_like(I); total = 0.0
+    for k in range(I.shape[0]):
+        p = I[k] * I[k] * R[k]
+        P[k] = p; total += p
+    return P, total
+
+def _powers_numpy(I, R):
+    # El total es un producto punto: Σ (I²)·R sale de una sola llamada BLAS
+    I2 = I * I
+    return I2 * R, float(I2 @ R)
+
+powers = njit(cache=True, fastmath=True)(_powers_py) if _HAS_NUMBA else _powers_numpy
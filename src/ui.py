@@ -1,92 +1,317 @@
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.align import Align
-from rich import box
+from functools import lru_cache
+from itertools import islice
+import numpy as np
+from rich.console import Console, Group
+from rich.style import Style
+from rich.text import Text
+from circuit_sim import node_order
+from stamp_numba import powers
+# Table/Panel/Align/box se importan dentro de cada función: solo se cargan al dibujar
 
-console = Console()
+class Ansi(str):
+    """Salida ya renderada (con códigos ANSI): BufferedConsole la escribe tal cual, sin Rich."""
+
+class BufferedConsole(Console):
+    """
+    Console que junta lo que se va a mostrar con write() y lo emite en un solo print (flush()).
+    Cada pantalla se arma entera en memoria y se escribe de una vez, antes de pedir un dato.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buf = []
+
+    def write(self, *renderables):
+        self._buf.extend(renderables)
+
+    def render_ansi(self, renderable) -> Ansi:
+        """Renderiza a texto ANSI (sin tocar el buffer), para guardar y reescribir sin Rich."""
+        with self.capture() as cap:
+            Console.print(self, renderable)
+        return Ansi(cap.get())
+
+    def flush(self):
+        if self._buf:
+            buf, self._buf = self._buf, []
+            # Tramos seguidos de renderables se renderizan a memoria; lo Ansi va tal cual.
+            # Todo sale a la terminal en una única escritura
+            salida, tramo = [], []
+            for r in buf + [None]:
+                if isinstance(r, Ansi) or r is None:
+                    if tramo: salida.append(self.render_ansi(Group(*tramo))); tramo = []
+                    if r is not None: salida.append(r)
+                else:
+                    tramo.append(r)
+            self.file.write(''.join(salida))
+            self.file.flush()
+
+    def print(self, *args, **kwargs):
+        # Un print directo no se adelanta a lo que ya estaba en el buffer
+        self.flush()
+        super().print(*args, **kwargs)
+
+_console = None
+
+def _get_console():
+    """
+    La Console se crea la primera vez que se dibuja algo (no al importar ui): detectar la
+    terminal y su ancho no se paga en usos sin pantalla.
+    """
+    global _console
+    if _console is None:
+        # Sin resaltado automático (regex sobre cada texto) ni códigos :emoji:; los estilos van explícitos
+        _console = BufferedConsole(highlight=False, emoji=False)
+        # Ancho de la terminal consultado una sola vez: fijarlo evita el ioctl/WinAPI en cada render
+        _console.width = _console.width
+    return _console
+
+def __getattr__(nombre):
+    # ui.console desde otros módulos sigue funcionando, creada recién al usarla
+    if nombre == "console": return _get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 # --- TU FIRMA ---
 NOMBRE_ALUMNO = "Victoria"
 
-def mostrar_encabezado():
-    console.clear()
+@lru_cache(maxsize=1)
+def _encabezado():
+    """Panel del encabezado; se arma (y se parsea su markup) una sola vez."""
+    from rich.panel import Panel
+    from rich.align import Align
     titulo = f"""
     [bold cyan]SIMULADOR DE CIRCUITOS CC (MNA)[/bold cyan]
     [italic]Coloquio de Física 2 - Sistema Interactivo[/italic]
     
     [dim]Desarrollado por:[/dim] [bold yellow]{NOMBRE_ALUMNO}[/bold yellow]
     """
-    console.print(Panel(Align.center(titulo), border_style="blue"))
+    return Panel(Align.center(_get_console().render_str(titulo)), border_style="blue")
 
-def mostrar_ayuda_navegacion():
-    console.print(
+def mostrar_encabezado():
+    """Empieza una pantalla nueva: vuelca lo pendiente, limpia y deja el encabezado en el buffer."""
+    console = _get_console()
+    console.flush()
+    console.clear()
+    console.write(_encabezado())
+
+# Texto fijo: se construye al importar y se reimprime tal cual
+AYUDA_NAVEGACION = Group(
+    Text.from_markup(
         "[dim]Atajos:[/dim] [bold red]Q[/] Salir | [bold yellow]R[/] Reiniciar | [bold cyan]B[/] Volver atrás\n"
         "[dim]Formatos:[/dim] 10k (10000), 5m (0.005), 220 (220)",
         justify="center", style="dim"
-    )
-    console.print("")
+    ),
+    Text(""),
+)
+
+@lru_cache(maxsize=1)
+def _ayuda_ansi():
+    """La ayuda renderada a ANSI una sola vez (con el ancho fijo de la sesión)."""
+    return _get_console().render_ansi(AYUDA_NAVEGACION)
+
+def mostrar_ayuda_navegacion():
+    _get_console().write(_ayuda_ansi())
+
+# Menús fijos: un único console.print por repintado
+MENU_PRINCIPAL = Group(
+    Text("\n[1] Cargar Ejercicio 10 (TP4)"),
+    Text("[2] Crear circuito nuevo paso a paso"),
+)
+
+MENU_CREAR = Group(
+    Text("\n[1] Agregar Resistencia (R)"),
+    Text("[2] Agregar Fuente de Voltaje (V)"),
+    Text.from_markup("[3] [bold green]CALCULAR Y SIMULAR ▶[/bold green]"),
+)
+
+# Partes con estilo del esquema de cada componente (fuente: "(+ V -)", resistencia: "█R█")
+_S_FUENTE = Style(bold=True, color="red")
+_S_CUERPO = Style(bold=True, color="white")
+_S_LETRA = _S_CUERPO + Style(dim=True)
 
 def mostrar_resumen_vivo(circ):
+    from rich.table import Table
+    from rich.panel import Panel
+    from rich import box
+    console = _get_console()
+
     if not circ.resistors and not circ.vsources:
         # ARREGLADO: Cerrado correctamente con [/]
-        console.print(Panel("[dim italic]El circuito está vacío. Agrega componentes.[/]", title="Lienzo del Circuito", border_style="dim"))
+        console.write(Panel("[dim italic]El circuito está vacío. Agrega componentes.[/]", title="Lienzo del Circuito", border_style="dim"))
         return
 
-    table = Table(title="[bold underline]DIAGRAMA DE CONEXIONES[/bold underline]", show_header=True, header_style="bold white", box=box.SIMPLE_HEAVY, expand=True)
+    table = Table(title="[bold underline]DIAGRAMA DE CONEXIONES[/bold underline]", show_header=True, header_style="bold white", box=box.SIMPLE_HEAVY, width=console.width)
     table.add_column("ID", style="cyan", width=6)
     table.add_column("Esquema Visual", style="yellow", justify="center")
     table.add_column("Nodos", justify="center", style="dim")
     table.add_column("Valor", justify="right", style="green")
 
     for v in circ.vsources:
-        grafico = f"({v.n_plus}) ──[bold red](+ V -)[/]── ({v.n_minus})"
-        nodos_txt = f"{v.n_plus} → {v.n_minus}"
+        # Text.assemble arma la celda por partes ya estilizadas: sin markup que parsear
+        grafico = Text.assemble(f"({v.n_plus}) ──", ("(+ V -)", _S_FUENTE), f"── ({v.n_minus})")
+        nodos_txt = Text(f"{v.n_plus} → {v.n_minus}")
         table.add_row(v.name, grafico, nodos_txt, f"{v.value} V")
 
     for r in circ.resistors:
-        grafico = f"({r.n1}) ───[bold white]█[dim]R[/]█[/]─── ({r.n2})"
-        nodos_txt = f"{r.n1} ↔ {r.n2}"
+        grafico = Text.assemble(f"({r.n1}) ───", ("█", _S_CUERPO), ("R", _S_LETRA), ("█", _S_CUERPO), f"─── ({r.n2})")
+        nodos_txt = Text(f"{r.n1} ↔ {r.n2}")
         table.add_row(r.name, grafico, nodos_txt, f"{r.value} Ω")
 
-    console.print(table)
+    console.write(table)
+
+# Estilos de las tablas de resultados, resueltos una vez (sin parsear "bold green" en cada llamada)
+_S_DIM = Style(dim=True)
+_S_VOLTAJE = Style(bold=True, color="green")
+_S_NOMBRE = Style(bold=True, color="cyan")
+_S_CORRIENTE = Style(bold=True, color="white")
+_S_POTENCIA = Style(bold=True, color="red")
+_S_HEAD_NODOS = Style(bold=True, color="magenta")
+_S_HEAD_COMP = Style(bold=True, color="yellow")
+_S_GND = Style(bold=True, color="white")
+_S_NODO = Style(color="cyan")
+_S_TOTAL = Style(bold=True, underline=True, color="red")
+# Estilo y texto de la celda de nodo que no siguen la regla general (solo tierra)
+_STYLE_CACHE = {"0": (_S_GND, "TIERRA (GND)")}
 
-def mostrar_resultados(voltages, res_currents, vsrc_currents):
+# Columnas fijas de cada tabla: (encabezado, opciones de add_column)
+_COLS_NODOS = (
+    ("Nodo", dict(style=_S_DIM, justify="center")),
+    ("Voltaje (V)", dict(justify="right", style=_S_VOLTAJE)),
+)
+_COLS_COMP = (
+    ("Componente", dict(style=_S_NOMBRE)),
+    ("Valor", dict(justify="right")),
+    ("Corriente (A)", dict(justify="right", style=_S_CORRIENTE)),
+    ("Potencia (W)", dict(justify="right", style=_S_POTENCIA)),
+    ("Conexión", dict(style=_S_DIM)),
+)
+
+# Con más resistencias que esto la tabla de componentes se imprime por bloques (no entera en memoria)
+FILAS_STREAM = 500
+_BLOQUE = 200
+
+def _tabla(titulo, header_style, columnas, **opciones):
+    """Table nueva (las filas no se comparten) con columnas y estilos ya armados."""
+    from rich.table import Table
+    from rich import box
+    config = dict(title=titulo, show_header=True, header_style=header_style, expand=False, box=box.ROUNDED)
+    config.update(opciones)
+    table = Table(**config)
+    for nombre, opc in columnas: table.add_column(nombre, **opc)
+    return table
+
+# Valores y conexiones se repiten (mismo circuito re-simulado, valores comerciales de R):
+# se formatean una vez y después se reutiliza el mismo str
+@lru_cache(maxsize=2048)
+def _ohm(R):
+    return f"{R:.1f} Ω"
+
+@lru_cache(maxsize=4096)
+def _conn(n1, n2):
+    return f"N{n1} → N{n2}"
+
+def _iter_rows(res, P, vsrc):
+    """
+    Filas ya formateadas (str) de la tabla de componentes en una sola pasada: resistencias y
+    después fuentes de tensión. Las resistencias se formatean de a _BLOQUE (NumPy), no todas juntas.
+    """
+    for a in range(0, len(res), _BLOQUE):
+        r = res[a:a + _BLOQUE]
+        yield from zip(
+            r.name.tolist(),
+            list(map(_ohm, r.R.tolist())),
+            np.char.mod("%.5f", r.I).tolist(),
+            np.char.mod("%.5f", P[a:a + _BLOQUE]).tolist(),
+            list(map(_conn, r.n1.tolist(), r.n2.tolist())),
+        )
+    for name, i_s in zip(vsrc.name.tolist(), np.char.mod("%.5f", vsrc.I).tolist()):
+        yield name, "Fuente V", i_s, "-", "Suministro"
+
+def _pie_total(console, table, total_power):
+    """
+    Total disipado debajo de la tabla (no como fila con add_section): una línea y el texto,
+    del ancho de la tabla. Con columnas de ancho fijo medir la tabla no recorre las celdas.
+    """
+    from rich.constrain import Constrain
+    from rich.rule import Rule
+    ancho = console.measure(table).maximum
+    total = Text.assemble(("TOTAL DISIPADO ", _S_DIM), (f"{total_power:.5f} W", _S_TOTAL), ("  Ef. Joule", _S_DIM), justify="right")
+    return Constrain(Rule(style=_S_DIM), ancho), Constrain(total, ancho)
+
+def _largo(a):
+    """Largo del texto más largo de un arreglo de strings (0 si está vacío)."""
+    return int(np.char.str_len(a).max()) if len(a) else 0
+
+def _extremos(fmt, x):
+    """Ancho de una columna numérica: basta formatear el mínimo y el máximo."""
+    return max((len(fmt % v) for v in (x.min(), x.max())), default=0) if len(x) else 0
+
+def _fijas(columnas, *anchos):
+    """
+    Columnas con ancho fijo: el ancho es el mayor entre el encabezado y los candidatos de cada
+    columna. Con width fijo Rich no mide celda por celda.
+    """
+    return [(nombre, dict(opc, width=max(len(nombre), *cand), no_wrap=True, overflow="ellipsis"))
+            for (nombre, opc), cand in zip(columnas, anchos)]
+
+def _cols_nodos(nodes, V):
+    return _fijas(_COLS_NODOS, (_largo(nodes), len(_STYLE_CACHE["0"][1])), (_extremos("%.4f", V),))
+
+def _cols_componentes(res, P, vsrc):
+    # Filas (por sus extremos, sin formatear todo) y el pie de la tabla
+    return _fijas(_COLS_COMP,
+        (_largo(res.name), _largo(vsrc.name)),
+        (_extremos("%.1f Ω", res.R), len("Fuente V")),
+        (_extremos("%.5f", res.I), _extremos("%.5f", vsrc.I)),
+        (_extremos("%.5f", P),),
+        (_largo(res.n1) + _largo(res.n2) + 5, len("Suministro")),
+    )
+
+def _componentes_por_bloques(res, P, vsrc, total_power):
+    """
+    Tabla de componentes para circuitos grandes: anchos fijos calculados de antemano y
+    se imprime de a _BLOQUE filas (tablas sin bordes de arriba/abajo que se empalman).
+    """
+    from rich import box
+    console = _get_console()
+    cols = _cols_componentes(res, P, vsrc)
+    bloque = lambda **kw: _tabla(None, _S_HEAD_COMP, cols, box=box.SIMPLE_HEAD, show_edge=False, **kw)
+
+    console.print(Text(), bloque(title="🔌 Análisis de Componentes"))  # solo encabezado
+    filas = _iter_rows(res, P, vsrc)
+    while True:
+        table = bloque(show_header=False)
+        for row in islice(filas, _BLOQUE): table.add_row(*row)
+        if table.row_count: console.print(table)
+        if table.row_count < _BLOQUE: break
+    console.print(*_pie_total(console, table, total_power))
+
+def mostrar_resultados(nodes, V, res, vsrc):
+    """Tablas de resultados a partir de los arreglos de circ.solve(soa=True)."""
+    console = _get_console()
     # Tabla de Voltajes
-    table_nodes = Table(title="⚡ Voltajes en Nodos", show_header=True, header_style="bold magenta", expand=True, box=box.ROUNDED)
-    table_nodes.add_column("Nodo", style="dim", justify="center")
-    table_nodes.add_column("Voltaje (V)", justify="right", style="bold green")
+    table_nodes = _tabla("⚡ Voltajes en Nodos", _S_HEAD_NODOS, _cols_nodos(nodes, V))
 
-    try:
-        sorted_nodes = sorted(voltages.items(), key=lambda x: int(x[0]))
-    except ValueError:
-        sorted_nodes = sorted(voltages.items(), key=lambda x: x[0])
+    # El solver deja los nodos en orden de aparición; se ordenan recién para mostrarlos
+    etiquetas = np.asarray(nodes, dtype=str).tolist()  # str de Python una vez, no str(n) por nodo
+    for k in node_order(nodes).tolist():
+        n = etiquetas[k]
+        # Un solo lookup decide estilo y texto; Text con Style ya armado no pasa por el parser de markup
+        estilo, texto = _STYLE_CACHE.get(n) or (_S_NODO, n)
+        table_nodes.add_row(Text(texto, style=estilo), Text(f"{V[k]:.4f}"))
 
-    for n, v in sorted_nodes:
-        estilo = "bold white" if str(n) == "0" else "cyan"
-        etiqueta = "TIERRA (GND)" if str(n) == "0" else str(n)
-        table_nodes.add_row(f"[{estilo}]{etiqueta}[/{estilo}]", f"{v:.4f}")
+    # Potencias y total en un solo kernel (Numba si está; si no, NumPy), no fila por fila
+    P, total_power = powers(np.ascontiguousarray(res.I), np.ascontiguousarray(res.R))
 
-    # Tabla de Componentes
-    table_comp = Table(title="🔌 Análisis de Componentes", show_header=True, header_style="bold yellow", expand=True, box=box.ROUNDED)
-    table_comp.add_column("Componente", style="bold cyan")
-    table_comp.add_column("Valor", justify="right")
-    table_comp.add_column("Corriente (A)", justify="right", style="bold white")
-    table_comp.add_column("Potencia (W)", justify="right", style="bold red")
-    table_comp.add_column("Conexión", style="dim")
-
-    total_power = 0.0
-    
-    for name, data in res_currents.items():
-        I, n1, n2, R = data
-        P = (I**2) * R
-        total_power += P
-        table_comp.add_row(name, f"{R:.1f} Ω", f"{I:.5f}", f"{P:.5f}", f"N{n1} → N{n2}")
+    if len(res) > FILAS_STREAM:
+        console.write(Text(), table_nodes)
+        _componentes_por_bloques(res, P, vsrc, total_power)
+        return
 
-    for name, I in vsrc_currents.items():
-        table_comp.add_row(name, "Fuente V", f"{I:.5f}", "-", "Suministro")
+    # Tabla de Componentes
+    table_comp = _tabla("🔌 Análisis de Componentes", _S_HEAD_COMP, _cols_componentes(res, P, vsrc))
+    for row in _iter_rows(res, P, vsrc): table_comp.add_row(*row)
 
-    table_comp.add_section()
-    table_comp.add_row("TOTAL DISIPADO", "", "", f"[bold underline red]{total_power:.5f}[/]", "Ef. Joule")
+    console.write(Text(), table_nodes, Text(), table_comp, *_pie_total(console, table_comp, total_power))
 
-    console.print("\n", table_nodes, "\n", table_comp)
\ No newline at end of file
+def mostrar_error_matematico(e):
+    from rich.panel import Panel
+    _get_console().write(Panel(f"[bold red]Error Matemático:[/bold red] {e}\n\nCausa probable: Circuito abierto o sin Tierra (0).", title="ERROR", border_style="red"))
\ No newline at end of file
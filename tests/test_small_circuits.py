@@ -1,11 +1,17 @@
 import sys
 import os
 import math
+import pickle
+import numpy as np
 
 # Truco para poder importar 'src' desde la carpeta 'tests'
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from circuit_sim import parse_netlist_lines
+from circuit_sim import parse_netlist_lines, load_netlist, solve_sparse, parse_value, export_results_csv, draw_circuit, _layout, node_order, node_sort_key
+import netlist_cache
+import stamp_numba
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), '..', 'examples')
 
 def test_voltage_divider():
     """
@@ -38,5 +44,284 @@ def test_voltage_divider():
     
     print("¡Test del Divisor de Voltaje PASÓ correctamente!")
 
+def test_parse_value_suffixes():
+    """Prefijos SI, sufijos con unidad y valores inválidos."""
+    assert parse_value('10k') == 10000.0
+    assert math.isclose(parse_value('5mA'), 0.005)
+    assert math.isclose(parse_value('2.2u'), 2.2e-6)
+    assert parse_value('1e3k') == 1e6
+    assert parse_value('220') == 220.0
+    assert parse_value('4.7kOhm') == 4700.0
+    for malo in ('k', '10x', '1..2k'):
+        try:
+            parse_value(malo)
+            assert False, malo
+        except ValueError:
+            pass
+
+def test_node_order():
+    """node_order (argsort) ordena igual que node_sort_key: números por valor, después texto."""
+    nodes = ['0', '10', 'b', '2', 'a', '99999999999999999999999', '1']
+    orden = [nodes[k] for k in node_order(nodes)]
+    assert orden == sorted(nodes, key=node_sort_key)
+    assert [nodes[k] for k in node_order(nodes[:5])] == ['0', '2', '10', 'a', 'b']
+
+def test_sparse_matches_dense():
+    """
+    El camino disperso (splu) debe dar lo mismo que el denso
+    en el ejemplo con fuente de corriente.
+    """
+    circ = load_netlist(os.path.join(EXAMPLES, 'example.net'))
+    V_d, I_d, E_d = circ.solve(use_sparse_if_possible=False)
+    V_s, I_s, E_s = solve_sparse(circ)
+
+    for n in V_d:
+        assert math.isclose(V_d[n], V_s[n], abs_tol=1e-9)
+    for name in I_d:
+        assert math.isclose(I_d[name][0], I_s[name][0], abs_tol=1e-12)
+    assert math.isclose(E_d['V1'], E_s['V1'], abs_tol=1e-12)
+
+    # La matriz dispersa sale directo de las tripletas en CSC, igual a la densa
+    A_s, z_s = circ.assemble_mna_sparse()[:2]
+    A_d, z_d = circ.assemble_mna()[:2]
+    assert A_s.format == 'csc'
+    assert np.allclose(A_s.toarray(), A_d) and np.allclose(z_s, z_d)
+
+def test_soa_results_match_dicts():
+    """
+    solve(soa=True) devuelve lo mismo que los dicts, en arreglos paralelos:
+    tierra primero y el resto en orden de aparición (node_order los ordena para mostrar).
+    """
+    circ = load_netlist(os.path.join(EXAMPLES, 'example.net'))
+    voltages, res_currents, vsrc_currents = circ.solve()
+    nodes, V, res, vsrc = circ.solve(soa=True)
+
+    assert list(nodes) == ['0', '1', '2']
+    for n, v in zip(nodes, V):
+        assert math.isclose(voltages[n], v, abs_tol=1e-12)
+    for r in res:
+        assert math.isclose(res_currents[r.name][0], r.I, abs_tol=1e-12)
+    assert math.isclose(vsrc_currents['V1'], vsrc.I[0], abs_tol=1e-12)
+    assert circ.solve(soa=True).res_currents_dict() == res_currents
+
+def test_compiled_topology_reuse():
+    """
+    Tras compile() y la primera factorización, cambiar valores y volver a
+    resolver (mismo patrón, orden COLAMD reutilizado) da lo mismo que el denso.
+    El Circuit sigue siendo pickleable (la caché de netlists lo necesita).
+    """
+    circ = load_netlist(os.path.join(EXAMPLES, 'example.net'))
+    solve_sparse(circ)
+    assert circ._perm_c is not None
+    circ.resistors[1].value = 330.0
+    circ.isources[0].value = 2e-3
+    V_s, _, _ = solve_sparse(circ)
+    V_d, _, _ = circ.solve(use_sparse_if_possible=False)
+    for n in V_d:
+        assert math.isclose(V_s[n], V_d[n], abs_tol=1e-9)
+    assert pickle.loads(pickle.dumps(circ))._lu is None
+
+def test_factorization_reused_when_only_sources_change():
+    """
+    Si solo cambian fuentes, solve() reutiliza la misma LU; al cambiar una R refactoriza.
+    """
+    circ = load_netlist(os.path.join(EXAMPLES, 'example.net'))
+    circ.solve()
+    lu = circ._lu
+    circ.vsources[0].value = 20.0
+    V, _, _ = circ.solve()
+    assert circ._lu is lu
+    assert math.isclose(V['1'], 20.0, abs_tol=1e-12)
+
+    circ.resistors[0].value = 150.0
+    circ.solve()
+    assert circ._lu is not lu
+
+def test_dense_lu_reused_without_assembling_a():
+    """El respaldo denso con la LU guardada solo arma z: assemble_mna no se vuelve a llamar."""
+    circ = parse_netlist_lines(['V1 1 0 10', 'R1 1 2 1k', 'R2 2 0 1k', 'I1 2 0 1m'])
+    circ.solve(use_sparse_if_possible=False)
+    circ.vsources[0].value = 20.0
+    circ.assemble_mna = None  # si se llamara, TypeError
+    V, _, _ = circ.solve(use_sparse_if_possible=False)
+    assert math.isclose(V['2'], 9.5, abs_tol=1e-9)
+
+def test_netlist_cache(tmp_path, monkeypatch):
+    """
+    La segunda carga sale del pickle; si el .net cambia (otro mtime)
+    se vuelve a parsear.
+    """
+    monkeypatch.setattr(netlist_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    net = tmp_path / 'div.net'
+    net.write_text('V1 1 0 12\nR1 1 2 1000\nR2 2 0 2000\n')
+
+    c1 = netlist_cache.cached_load_netlist(str(net))
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+    c2 = netlist_cache.cached_load_netlist(str(net))
+    assert [r.name for r in c2.resistors] == ['R1', 'R2']
+
+    net.write_text('V1 1 0 12\nR1 1 2 1000\n')
+    os.utime(net, ns=(0, os.stat(net).st_mtime_ns + 10**9))
+    c3 = netlist_cache.cached_load_netlist(str(net))
+    assert [r.name for r in c3.resistors] == ['R1']
+
+def test_resolve_with_update():
+    """
+    Editar valores reutilizando la LU (Sherman-Morrison para R, solo b
+    para fuentes) debe coincidir con resolver desde cero.
+    """
+    circ = load_netlist(os.path.join(EXAMPLES, 'example.net'))
+    solve_sparse(circ)
+    circ.resolve_with_update(circ.component('R2'), 470)
+    circ.resolve_with_update(circ.resistors[0], 330)
+    V_u, I_u, E_u = circ.resolve_with_update(circ.vsources[0], 5)
+
+    V_ref, I_ref, E_ref = circ.solve(use_sparse_if_possible=False)
+    for n in V_ref:
+        assert math.isclose(V_u[n], V_ref[n], abs_tol=1e-9)
+    assert math.isclose(E_u['V1'], E_ref['V1'], abs_tol=1e-12)
+
+def test_resolve_with_update_isource():
+    """Editar una fuente de corriente (solo cambia b) coincide con resolver desde cero."""
+    circ = parse_netlist_lines(['V1 1 0 10', 'R1 1 2 1k', 'R2 2 3 2k', 'R3 3 0 1k', 'I1 2 3 1m'])
+    solve_sparse(circ)
+    circ.resolve_with_update(circ.component('I1'), 3e-3)
+    circ.resolve_with_update(circ.component('R2'), 470)
+    V_u, I_u, E_u = circ.resolve_with_update(circ.component('I1'), -2e-3)
+
+    V_ref, I_ref, E_ref = circ.solve(use_sparse_if_possible=False)
+    for n in V_ref:
+        assert math.isclose(V_u[n], V_ref[n], abs_tol=1e-9)
+    for r in I_ref:
+        assert math.isclose(I_u[r][0], I_ref[r][0], abs_tol=1e-12)
+    assert math.isclose(E_u['V1'], E_ref['V1'], abs_tol=1e-12)
+
+def test_resolve_with_update_after_direct_edits():
+    """Editar una vista con .value = ... y luego resolve_with_update no usa LU ni b viejos."""
+    lines = ['V1 1 0 10', 'R1 1 2 1k', 'R2 2 0 1k']
+    circ = parse_netlist_lines(lines)
+    solve_sparse(circ)
+    circ.vsources[0].value = 20
+    V_u, _, _ = circ.resolve_with_update(circ.component('R1'), 1000)
+    assert math.isclose(V_u['1'], 20.0, abs_tol=1e-9)
+
+    circ = parse_netlist_lines(lines)
+    solve_sparse(circ)
+    circ.resistors[1].value = 3000
+    V_u, _, _ = circ.resolve_with_update(circ.component('V1'), 10)
+    assert math.isclose(V_u['2'], 7.5, abs_tol=1e-9)
+
+def test_source_views_use_labels():
+    """Las vistas de fuentes devuelven etiquetas (no ids internos), igual que Resistor."""
+    circ = parse_netlist_lines(['V1 in 0 12', 'R1 in out 1k', 'R2 out 0 1k', 'I1 out 0 1m'])
+    assert (circ.vsources[0].n_plus, circ.vsources[0].n_minus) == ('in', '0')
+    assert (circ.component('I1').n_plus, circ.component('I1').n_minus) == ('out', '0')
+
+    solve_sparse(circ)
+    V_u, _, _ = circ.resolve_with_update(circ.component('I1'), 2e-3)
+    assert math.isclose(V_u['out'], 5.0, abs_tol=1e-9)
+
+def test_stamp_paths_agree():
+    """
+    El kernel para Numba (bucle) y el respaldo NumPy deben estampar
+    la misma G y B, incluso con resistencias en paralelo (índices repetidos).
+    """
+    circ = load_netlist(os.path.join(EXAMPLES, 'ejercicio_tp4.net'))
+    _, nodes = circ.node_index_map()
+    r_n1, r_n2, v_np, v_nn = circ.stamp_indices()[:4]
+    r_val = np.array([r.value for r in circ.resistors])
+    N = len(nodes); M = len(circ.vsources)
+
+    G1, B1 = np.zeros((N, N)), np.zeros((N, M))
+    G2, B2 = np.zeros((N, N)), np.zeros((N, M))
+    stamp_numba._stamp_py(r_n1, r_n2, r_val, v_np, v_nn, G1, B1)
+    stamp_numba._stamp_numpy(r_n1, r_n2, r_val, v_np, v_nn, G2, B2)
+    assert np.allclose(G1, G2) and np.array_equal(B1, B2)
+
+    # Tripletas de 4 lugares fijos (kernel paralelo): mismas entradas, otro orden
+    rows, cols, slot, sign = stamp_numba._triplets_py(r_n1, r_n2)
+    ok = rows >= 0
+    G3 = np.zeros((N, N))
+    np.add.at(G3, (rows[ok], cols[ok]), sign[ok] / r_val[slot[ok]])
+    assert np.allclose(G1, G3)
+
+def test_powers_paths_agree():
+    """El kernel de potencias (bucle para Numba) y el de NumPy dan lo mismo."""
+    I = np.array([0.004, -0.002, 0.0]); R = np.array([1000.0, 50.0, 10.0])
+    P1, t1 = stamp_numba._powers_py(I, R)
+    P2, t2 = stamp_numba._powers_numpy(I, R)
+    assert np.allclose(P1, P2) and math.isclose(t1, t2)
+    assert math.isclose(t1, 0.016 + 0.0002)
+
+def test_bulk_add_matches_single_adds():
+    """add_*_bulk deja el mismo circuito que agregar de a uno (GND incluido)."""
+    from circuit_sim import Circuit
+    c1 = Circuit()
+    c1.add_vsource('V1', 'in', 'GND', 9)
+    c1.add_resistor('R1', 'in', 'out', 1000); c1.add_resistor('R2', 'out', '0', 2000)
+    c2 = Circuit()
+    c2.add_vsources_bulk(['V1'], ['in'], ['GND'], [9])
+    c2.add_resistors_bulk(['R1', 'R2'], ['in', 'out'], ['out', '0'], np.array([1000.0, 2000.0]))
+
+    assert c1.nodes == c2.nodes
+    assert c1.solve() == c2.solve()
+    assert c2.component('R2').n2 == '0'
+
+def test_export_results_csv(tmp_path):
+    """El CSV tiene los tres bloques y los valores con 12 cifras significativas."""
+    circ = parse_netlist_lines(['V1 1 0 12', 'R1 1 2 1k', 'R2 2 0 2k'])
+    out = tmp_path / 'res.csv'
+    export_results_csv(str(out), *circ.solve(soa=True))
+
+    lineas = out.read_text().splitlines()
+    assert lineas[:4] == ['node,voltage', '0,0', '1,12', '2,8']
+    assert 'R1,1,2,0.004,1000,0.016' in lineas
+    assert lineas[-2:] == ['vsource,current', 'V1,-0.004']
+
+    # etiquetas no ASCII o con ',' se escriben en UTF-8 y entre comillas
+    circ = parse_netlist_lines(['V1 señal 0 12', 'R1 señal a,b 1k', 'R2 a,b 0 2k'])
+    export_results_csv(str(out), *circ.solve(soa=True))
+    lineas = out.read_text(encoding='utf-8').splitlines()
+    assert lineas[1:4] == ['0,0', '"a,b",8', 'señal,12']
+    assert 'R1,señal,"a,b",0.004,1000,0.016' in lineas
+
+def test_draw_circuit(tmp_path):
+    """El SVG tiene una línea por componente y un círculo por nodo; se escribe en UTF-8."""
+    circ = parse_netlist_lines(['V1 in 0 12', 'Rñ in out 1k', 'R2 out 0 2k', 'I1 out 0 1m'])
+    out = tmp_path / 'c.svg'
+    draw_circuit(circ, str(out))
+
+    svg = out.read_text(encoding='utf-8')
+    assert svg.count('<line ') == 4
+    assert svg.count('<circle ') == 3
+    assert '>Rñ<' in svg
+
+def test_layout_spectral_for_large_circuits():
+    """Con más de 20 nodos el layout es el espectral: coordenadas finitas en [-1, 1], no el círculo."""
+    lines = ['V1 1 0 10'] + [f'R{k} {k} {k + 1} 1k' for k in range(1, 25)] + ['R25 25 0 1k']
+    circ = parse_netlist_lines(lines)
+    xy = _layout(circ)
+
+    n = len(circ.nodes)
+    t = 2 * np.pi * np.arange(n) / n
+    assert xy.shape == (n, 2)
+    assert np.all(np.isfinite(xy)) and np.all(np.abs(xy) <= 1.0 + 1e-12)
+    assert not np.allclose(xy, np.column_stack((np.cos(t), np.sin(t))))
+
 if __name__ == "__main__":
-    test_voltage_divider()
\ No newline at end of file
+    test_voltage_divider()
+    test_parse_value_suffixes()
+    test_node_order()
+    test_sparse_matches_dense()
+    test_soa_results_match_dicts()
+    test_compiled_topology_reuse()
+    test_factorization_reused_when_only_sources_change()
+    test_dense_lu_reused_without_assembling_a()
+    test_resolve_with_update()
+    test_resolve_with_update_isource()
+    test_resolve_with_update_after_direct_edits()
+    test_source_views_use_labels()
+    test_stamp_paths_agree()
+    test_powers_paths_agree()
+    test_bulk_add_matches_single_adds()
+    test_layout_spectral_for_large_circuits()